@@ -1,11 +1,52 @@
 import argparse
+import asyncio
 import copy
+import itertools
 import math
+import mmap
 import os
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import zarr
+from zarr.abc.store import OffsetByteRequest, RangeByteRequest, SuffixByteRequest
+from zarr.core.buffer import default_buffer_prototype
+from zarr.storage import LocalStore
+
+
+class _MmapLocalStore(LocalStore):
+    # Read-only LocalStore that hands chunks (or shard byte ranges) to the codecs as views of a
+    # memory map instead of copying each file into a fresh bytes object first.
+
+    async def get(self, key, prototype=None, byte_range=None):
+        if prototype is None:
+            prototype = default_buffer_prototype()
+        if not self._is_open:
+            await self._open()
+        try:
+            return await asyncio.to_thread(_mmap_get, self.root / key, prototype, byte_range)
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+
+def _mmap_get(path, prototype, byte_range):
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return prototype.buffer.from_bytes(b"")
+        # The map stays alive as long as the returned buffer references it.
+        view = memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+    if byte_range is None:
+        return prototype.buffer.from_bytes(view)
+    if isinstance(byte_range, RangeByteRequest):
+        return prototype.buffer.from_bytes(view[byte_range.start : byte_range.end])
+    if isinstance(byte_range, OffsetByteRequest):
+        return prototype.buffer.from_bytes(view[byte_range.offset :])
+    if isinstance(byte_range, SuffixByteRequest):
+        return prototype.buffer.from_bytes(view[max(0, size - byte_range.suffix) :])
+    raise TypeError(f"Unexpected byte_range, got {byte_range}.")
 
 
 def _find_z_axis(multiscale):
@@ -26,19 +67,112 @@ def _get_scale(dataset_meta, ndim):
     return [1.0] * ndim
 
 
-def _copy_and_crop_level(src_arr, dst_arr, z_axis, src_start, src_stop, slab):
-    dst_pos = 0
-    n_copied = 0
-    for z0 in range(src_start, src_stop, slab):
-        z1 = min(z0 + slab, src_stop)
-        src_sel = [slice(None)] * src_arr.ndim
-        dst_sel = [slice(None)] * src_arr.ndim
+def _array_layout(src_arr, dst_shape, dst_chunks, z_axis):
+    # Reproduce the source encoding. Zarr v3 sources may be sharded; shards are clipped in Z
+    # like the chunks so the cropped array stays valid, and keep the source index location.
+    if src_arr.metadata.zarr_format == 2:
+        return {
+            "chunks": tuple(dst_chunks),
+            "compressor": src_arr.compressor,
+            "filters": src_arr.filters,
+            "order": getattr(src_arr, "order", "C"),
+        }
+
+    layout = {
+        "chunks": tuple(dst_chunks),
+        "compressors": src_arr.compressors,
+        "filters": src_arr.filters,
+        "serializer": src_arr.serializer,
+        "dimension_names": src_arr.metadata.dimension_names,
+    }
+    if src_arr.shards is not None:
+        dst_shards = list(src_arr.shards)
+        z_chunk = dst_chunks[z_axis]
+        dst_shards[z_axis] = min(dst_shards[z_axis], math.ceil(dst_shape[z_axis] / z_chunk) * z_chunk)
+        sharding = src_arr.metadata.codecs[0]
+        layout["shards"] = {"shape": tuple(dst_shards), "index_location": sharding.index_location}
+    return layout
+
+
+def _copy_and_crop_level(src_arr, dst_arr, z_axis, src_start, src_stop, block, z_origin, executor=None):
+    # Copy in blocks of shape `block`. Z block boundaries fall on z_origin + k * block[z_axis]
+    # (source coordinates, clipped to the crop); the other axes are tiled from 0.
+    z_step = block[z_axis]
+    z_first = src_start - (src_start - z_origin) % z_step
+    ranges = [range(0, n, b) for n, b in zip(src_arr.shape, block)]
+    ranges[z_axis] = range(z_first, src_stop, z_step)
+
+    def copy_one_block(starts):
+        src_sel = [slice(s, min(s + b, n)) for s, b, n in zip(starts, block, src_arr.shape)]
+        z0, z1 = max(starts[z_axis], src_start), min(starts[z_axis] + z_step, src_stop)
         src_sel[z_axis] = slice(z0, z1)
-        dst_sel[z_axis] = slice(dst_pos, dst_pos + (z1 - z0))
+        dst_sel = list(src_sel)
+        dst_sel[z_axis] = slice(z0 - src_start, z1 - src_start)
         dst_arr[tuple(dst_sel)] = src_arr[tuple(src_sel)]
-        dst_pos += z1 - z0
-        n_copied += z1 - z0
-    return n_copied
+
+    blocks = itertools.product(*ranges)
+    if executor is None:
+        for b in blocks:
+            copy_one_block(b)
+    else:
+        list(executor.map(copy_one_block, blocks))
+    return max(0, src_stop - src_start)
+
+
+def _write_unit(arr):
+    # Shards are the unit stored per key in sharded Zarr v3; otherwise chunks.
+    return arr.shards if getattr(arr, "shards", None) is not None else arr.chunks
+
+
+def _can_copy_raw(src_arr, dst_arr, z_axis, src_start, src_stop):
+    # Stored chunks/shards can be copied byte-for-byte when the crop starts on a source key
+    # boundary, ends on one (or at the end of the source) and the destination grid matches.
+    # The encoding must match too: same codecs (including the shard index layout) for v3, same
+    # compressor, filters, order and dtype for v2.
+    unit = _write_unit(src_arr)
+    if _write_unit(dst_arr) != unit or dst_arr.chunks != src_arr.chunks:
+        return False
+    if src_arr.metadata.zarr_format == 2:
+        src_meta, dst_meta = src_arr.metadata, dst_arr.metadata
+        if (src_meta.compressor, src_meta.filters, src_meta.order, src_meta.dtype) != (
+            dst_meta.compressor,
+            dst_meta.filters,
+            dst_meta.order,
+            dst_meta.dtype,
+        ):
+            return False
+    elif src_arr.metadata.codecs != dst_arr.metadata.codecs:
+        return False
+    if src_start % unit[z_axis] != 0:
+        return False
+    return (src_stop - src_start) % unit[z_axis] == 0 or src_stop == src_arr.shape[z_axis]
+
+
+def _copy_raw_level(src_arr, dst_arr, in_path, out_path, z_axis, src_start, src_stop, executor=None):
+    unit = _write_unit(src_arr)
+    z_offset = src_start // unit[z_axis]
+    grid = [range(math.ceil(n / u)) for n, u in zip(dst_arr.shape, unit)]
+    src_root = os.path.join(in_path, *src_arr.path.split("/"))
+    dst_root = os.path.join(out_path, *dst_arr.path.split("/"))
+
+    def copy_one_key(dst_coords):
+        src_coords = list(dst_coords)
+        src_coords[z_axis] += z_offset
+        src_file = os.path.join(src_root, *src_arr.metadata.encode_chunk_key(tuple(src_coords)).split("/"))
+        if not os.path.exists(src_file):
+            # Empty chunk: left unwritten so it reads back as fill_value.
+            return
+        dst_file = os.path.join(dst_root, *dst_arr.metadata.encode_chunk_key(tuple(dst_coords)).split("/"))
+        os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+        shutil.copyfile(src_file, dst_file)
+
+    coords = itertools.product(*grid)
+    if executor is None:
+        for c in coords:
+            copy_one_key(c)
+    else:
+        list(executor.map(copy_one_key, coords))
+    return src_stop - src_start
 
 
 def main():
@@ -48,12 +182,21 @@ def main():
     parser.add_argument("--z-start", type=int, required=True, help="Z start (inclusive, level 0)")
     parser.add_argument("--z-end", type=int, required=True, help="Z end (inclusive, level 0)")
     parser.add_argument("--overwrite", action="store_true", help="Overwrite output if it exists")
+    parser.add_argument(
+        "--copy-mode",
+        choices=["serial", "threaded"],
+        default="serial",
+        help="Copy chunk/shard-sized blocks one after another, or concurrently on a thread pool",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Threads used with --copy-mode threaded")
     args = parser.parse_args()
 
     if args.z_start < 0:
         raise ValueError("--z-start must be >= 0")
     if args.z_end < args.z_start:
         raise ValueError("--z-end must be >= --z-start")
+    if args.workers < 1:
+        raise ValueError("--workers must be >= 1")
 
     in_path = os.path.abspath(args.input)
     out_path = os.path.abspath(args.output)
@@ -66,11 +209,13 @@ def main():
         shutil.rmtree(out_path)
 
     t0 = time.time()
-    src = zarr.open_group(store=in_path, mode="r")
-    dst = zarr.open_group(store=out_path, mode="w", zarr_format=2)
+    src = zarr.open_group(store=_MmapLocalStore(in_path, read_only=True), mode="r")
+    dst = zarr.open_group(store=out_path, mode="w", zarr_format=src.metadata.zarr_format)
 
     root_attrs = copy.deepcopy(dict(src.attrs))
-    multiscales = root_attrs.get("multiscales", [])
+    # OME-NGFF 0.5 (Zarr v3) nests the metadata under "ome"; 0.4 keeps it at the root.
+    ome_attrs = root_attrs["ome"] if isinstance(root_attrs.get("ome"), dict) else root_attrs
+    multiscales = ome_attrs.get("multiscales", [])
     if not multiscales:
         raise RuntimeError("Input is missing multiscales metadata")
 
@@ -89,6 +234,7 @@ def main():
     first_arr = src[first_path]
     level0_scale = _get_scale(datasets[0], first_arr.ndim)
 
+    executor = ThreadPoolExecutor(args.workers) if args.copy_mode == "threaded" else None
     copied_summary = []
     for ds_meta in datasets:
         path = str(ds_meta["path"])
@@ -117,26 +263,50 @@ def main():
         dst_chunks = list(src_chunks)
         dst_chunks[z_axis] = min(dst_chunks[z_axis], dst_shape[z_axis])
 
+        layout = _array_layout(src_arr, dst_shape, dst_chunks, z_axis)
         dst_arr = dst.create_array(
             path,
             shape=tuple(dst_shape),
-            chunks=tuple(dst_chunks),
             dtype=src_arr.dtype,
-            compressor=src_arr.compressor,
-            filters=src_arr.filters,
             fill_value=src_arr.fill_value,
-            order=getattr(src_arr, "order", "C"),
             overwrite=True,
+            **layout,
         )
+        raw_copy = _can_copy_raw(src_arr, dst_arr, z_axis, level_start, level_stop)
+        if raw_copy:
+            copied_slices = _copy_raw_level(
+                src_arr=src_arr,
+                dst_arr=dst_arr,
+                in_path=in_path,
+                out_path=out_path,
+                z_axis=z_axis,
+                src_start=level_start,
+                src_stop=level_stop,
+                executor=executor,
+            )
+        else:
+            if executor is None:
+                # One source chunk/shard per block, aligned to the source grid, so each stored key
+                # is read once and memory stays at one shard.
+                block = tuple(int(u) for u in _write_unit(src_arr))
+                z_origin = 0
+            else:
+                # Concurrent blocks must not share a destination chunk/shard, so each task is one
+                # destination key (offset by level_start in source coordinates); memory stays at
+                # about one shard per worker.
+                block = tuple(int(u) for u in _write_unit(dst_arr))
+                z_origin = level_start
 
-        copied_slices = _copy_and_crop_level(
-            src_arr=src_arr,
-            dst_arr=dst_arr,
-            z_axis=z_axis,
-            src_start=level_start,
-            src_stop=level_stop,
-            slab=max(1, int(src_chunks[z_axis])),
-        )
+            copied_slices = _copy_and_crop_level(
+                src_arr=src_arr,
+                dst_arr=dst_arr,
+                z_axis=z_axis,
+                src_start=level_start,
+                src_stop=level_stop,
+                block=block,
+                z_origin=z_origin,
+                executor=executor,
+            )
 
         copied_summary.append(
             {
@@ -144,19 +314,23 @@ def main():
                 "factor_from_level0": factor,
                 "source_z_range": [level_start, level_stop - 1],
                 "copied_slices": copied_slices,
+                "raw_copy": raw_copy,
                 "dst_shape": list(dst_shape),
             }
         )
 
         print(
             f"level={path} factor={factor:.4g} z={level_start}:{level_stop} "
-            f"dst_shape={tuple(dst_shape)}",
+            f"dst_shape={tuple(dst_shape)} raw_copy={raw_copy}",
             flush=True,
         )
 
+    if executor is not None:
+        executor.shutdown()
+
     # Preserve metadata and add crop record.
-    if "omero" in root_attrs and isinstance(root_attrs["omero"], dict):
-        root_attrs["omero"]["name"] = os.path.basename(out_path)
+    if "omero" in ome_attrs and isinstance(ome_attrs["omero"], dict):
+        ome_attrs["omero"]["name"] = os.path.basename(out_path)
     root_attrs["crop"] = {
         "source": in_path,
         "z_start_inclusive": int(args.z_start),
@@ -1,22 +1,48 @@
 import argparse
 import json
 import math
+import multiprocessing
 import os
+import struct
+import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
 
 import h5py
 import hdf5plugin  # noqa: F401  # Registers HDF5 compression filters (e.g. LZ4)
 import numpy as np
 import zarr
-from numcodecs import Blosc
-
-
-G_SRC = None
-G_DST = None
-G_LEVELS = None
+from numcodecs import LZ4, Blosc, Zlib
+from numcodecs import blosc as numcodecs_blosc
+from zarr.codecs import BloscCodec
+
+
+# Per-worker state. Thread-local so the same initializer serves process and thread pools:
+# each thread gets its own HDF5 handle and scratch buffer.
+G_WORKER = threading.local()
+
+# HDF5 filter ids that the direct chunk reader knows how to undo.
+H5Z_FILTER_DEFLATE = 1
+H5Z_FILTER_SHUFFLE = 2
+H5Z_FILTER_BLOSC = 32001
+H5Z_FILTER_LZ4 = 32004
+# Compressor code stored in the HDF5 Blosc filter's cd_values[6].
+BLOSC_COMPCODE_LZ4 = 1
+
+# Upper bounds on how far a copy tile may grow past the Zarr write unit (in total voxels, and in
+# bytes unless the write unit alone is larger) to line up with IMS chunks. Every pool worker
+# holds two tile buffers.
+MAX_TILE_ALIGN_FACTOR = 4
+MAX_TILE_BYTES = 256 * 1024 * 1024
+# Target uncompressed shard size for Zarr v3 output. Each worker holds whole shards in memory,
+# so this also bounds the per-worker tile buffers.
+SHARD_TARGET_BYTES = 256 * 1024 * 1024
+# Shards grow in Z first (up to this many chunks), then in y/x with what is left of the target.
+# z-slab tasks step by the shard depth, so they never share a shard.
+SHARD_MAX_Z_FACTOR = 8
 
 
 @dataclass
@@ -26,6 +52,12 @@ class LevelInfo:
     src_shape_zyx: Tuple[int, int, int]
     dst_shape_zyx: Tuple[int, int, int]
     chunk_zyx: Tuple[int, int, int]
+    # Zarr write unit: the shard shape for sharded v3 output, otherwise the chunk shape.
+    write_zyx: Tuple[int, int, int]
+    ims_chunk_zyx: Tuple[int, int, int]
+    tile_zyx: Tuple[int, int, int]
+    ims_blosc_lz4: Optional[Tuple[int, int]] = None
+    raw_copy: bool = False
 
 
 
@@ -33,7 +65,11 @@ def _decode_attr(value) -> str:
     if isinstance(value, (bytes, np.bytes_)):
         return value.decode("utf-8", errors="ignore")
     if isinstance(value, np.ndarray):
-        if value.dtype.kind in ("S", "U", "O"):
+        if value.dtype.kind == "S":
+            return "".join(np.char.decode(value.ravel(), "utf-8", errors="ignore").tolist())
+        if value.dtype.kind == "U":
+            return "".join(value.ravel().tolist())
+        if value.dtype.kind == "O":
             parts = []
             for item in value.tolist():
                 if isinstance(item, (bytes, np.bytes_)):
@@ -74,7 +110,48 @@ def _sorted_resolution_levels(data_set_group) -> List[int]:
 
 
 
-def _build_level_infos(src_path: str, chunk_zyx: Tuple[int, int, int]) -> Tuple[List[LevelInfo], Dict]:
+def _ims_blosc_lz4_params(src_ds) -> Optional[Tuple[int, int]]:
+    # (clevel, shuffle) when the dataset is uint16 compressed by a single Blosc-LZ4 filter,
+    # i.e. its chunks are valid Zarr v2 Blosc chunks as-is.
+    if src_ds.chunks is None or src_ds.dtype != np.dtype("<u2"):
+        return None
+    plist = src_ds.id.get_create_plist()
+    if plist.get_nfilters() != 1:
+        return None
+    code, _, cd_values, _ = plist.get_filter(0)
+    if code != H5Z_FILTER_BLOSC or len(cd_values) < 7 or cd_values[6] != BLOSC_COMPCODE_LZ4:
+        return None
+    return int(cd_values[4]), int(cd_values[5])
+
+
+
+def _aligned_tile(
+    write_zyx: Tuple[int, int, int], ims_chunk_zyx: Tuple[int, int, int], dst_zyx: Tuple[int, int, int]
+) -> Tuple[int, int, int]:
+    # Grow the write unit, axis by axis (Z first), to a multiple of the IMS chunk so every
+    # compressed HDF5 chunk is decoded by exactly one read, as long as the whole tile stays
+    # within the voxel/byte budget. Axes that would exceed it keep the write-unit extent.
+    tile = [min(w, d) for w, d in zip(write_zyx, dst_zyx)]
+    base = math.prod(tile)
+    limit = min(MAX_TILE_ALIGN_FACTOR * base, max(base, MAX_TILE_BYTES // np.dtype(np.uint16).itemsize))
+    for axis in range(3):
+        grown = list(tile)
+        grown[axis] = min(math.lcm(write_zyx[axis], ims_chunk_zyx[axis]), dst_zyx[axis])
+        if math.prod(grown) <= limit:
+            tile = grown
+    return tuple(tile)
+
+
+
+def _shard_extent(chunk: int, factor: int, dim: int) -> int:
+    # Shards must hold whole chunks; do not grow past the chunk-rounded array extent.
+    return min(chunk * factor, math.ceil(dim / chunk) * chunk)
+
+
+
+def _build_level_infos(
+    src_path: str, chunk_zyx: Tuple[int, int, int], sharded: bool
+) -> Tuple[List[LevelInfo], Dict]:
     with h5py.File(src_path, "r") as f:
         data_set = f["DataSet"]
         dsi_image = f["DataSetInfo"]["Image"]
@@ -131,17 +208,29 @@ def _build_level_infos(src_path: str, chunk_zyx: Tuple[int, int, int]) -> Tuple[
             dst_y = min(src_y, exp_y)
             dst_z = min(src_z, exp_z)
 
+            cz = min(chunk_zyx[0], dst_z)
+            cy = min(chunk_zyx[1], dst_y)
+            cx = min(chunk_zyx[2], dst_x)
+            ims_cz, ims_cy, ims_cx = [int(v) for v in (src_ds.chunks or src_ds.shape)]
+            wz, wy, wx = cz, cy, cx
+            if sharded:
+                factor = max(1, SHARD_TARGET_BYTES // (cz * cy * cx * np.dtype(np.uint16).itemsize))
+                z_factor = min(SHARD_MAX_Z_FACTOR, factor, math.ceil(dst_z / cz))
+                yx_factor = max(1, int(math.sqrt(factor // z_factor)))
+                wz = _shard_extent(cz, z_factor, dst_z)
+                wy, wx = _shard_extent(cy, yx_factor, dst_y), _shard_extent(cx, yx_factor, dst_x)
+
             infos.append(
                 LevelInfo(
                     level=lvl,
                     src_path=f"DataSet/ResolutionLevel {lvl}/{timepoint_key}/{channel_key}/Data",
                     src_shape_zyx=(src_z, src_y, src_x),
                     dst_shape_zyx=(dst_z, dst_y, dst_x),
-                    chunk_zyx=(
-                        min(chunk_zyx[0], dst_z),
-                        min(chunk_zyx[1], dst_y),
-                        min(chunk_zyx[2], dst_x),
-                    ),
+                    chunk_zyx=(cz, cy, cx),
+                    write_zyx=(wz, wy, wx),
+                    ims_chunk_zyx=(ims_cz, ims_cy, ims_cx),
+                    tile_zyx=_aligned_tile((wz, wy, wx), (ims_cz, ims_cy, ims_cx), (dst_z, dst_y, dst_x)),
+                    ims_blosc_lz4=_ims_blosc_lz4_params(src_ds),
                 )
             )
 
@@ -158,12 +247,22 @@ def _build_level_infos(src_path: str, chunk_zyx: Tuple[int, int, int]) -> Tuple[
 
 
 
-def _create_omezarr_v2(out_path: str, infos: List[LevelInfo], meta: Dict, compression: str, clevel: int) -> None:
-    root = zarr.open_group(out_path, mode="w", zarr_format=2)
+def _create_omezarr(
+    out_path: str,
+    infos: List[LevelInfo],
+    meta: Dict,
+    compression: str,
+    clevel: int,
+    shuffle: int = Blosc.BITSHUFFLE,
+    zarr_format: int = 3,
+) -> None:
+    # Zarr v3 output is sharded and carries OME-NGFF 0.5 metadata; v2 keeps the flat
+    # chunk-per-file layout with OME-NGFF 0.4 metadata.
+    root = zarr.open_group(out_path, mode="w", zarr_format=zarr_format)
 
     compressor = None
     if compression == "lz4":
-        compressor = Blosc(cname="lz4", clevel=clevel, shuffle=Blosc.BITSHUFFLE)
+        compressor = Blosc(cname="lz4", clevel=clevel, shuffle=shuffle)
     elif compression == "zstd":
         compressor = Blosc(cname="zstd", clevel=clevel, shuffle=Blosc.BITSHUFFLE)
 
@@ -172,15 +271,29 @@ def _create_omezarr_v2(out_path: str, infos: List[LevelInfo], meta: Dict, compre
     for info in infos:
         z, y, x = info.dst_shape_zyx
         cz, cy, cx = info.chunk_zyx
+        if zarr_format == 2:
+            layout = {
+                "compressor": compressor,
+                "chunk_key_encoding": {"name": "v2", "separator": "/"},
+                "order": "C",
+            }
+        else:
+            layout = {
+                "compressors": _blosc_v3(compressor) if compressor is not None else None,
+                "dimension_names": ["t", "c", "z", "y", "x"],
+            }
+            if info.write_zyx != info.chunk_zyx:
+                # A one-chunk shard would only add an index to every file.
+                sz, sy, sx = info.write_zyx
+                layout["shards"] = (1, 1, sz, sy, sx)
         root.create_array(
             str(info.level),
             shape=(1, 1, z, y, x),
             chunks=(1, 1, cz, cy, cx),
             dtype=np.uint16,
-            compressor=compressor,
             overwrite=True,
-            chunk_key_encoding={"name": "v2", "separator": "/"},
-            order="C",
+            config={"write_empty_chunks": False},
+            **layout,
         )
         scale = [1.0, 1.0, vz * (2 ** info.level), vy * (2 ** info.level), vx * (2 ** info.level)]
         datasets_meta.append(
@@ -190,24 +303,19 @@ def _create_omezarr_v2(out_path: str, infos: List[LevelInfo], meta: Dict, compre
             }
         )
 
-    root.attrs["multiscales"] = [
-        {
-            "version": "0.4",
-            "name": "image",
-            "axes": [
-                {"name": "t", "type": "time", "unit": "second"},
-                {"name": "c", "type": "channel"},
-                {"name": "z", "type": "space", "unit": meta["unit"]},
-                {"name": "y", "type": "space", "unit": meta["unit"]},
-                {"name": "x", "type": "space", "unit": meta["unit"]},
-            ],
-            "datasets": datasets_meta,
-            "type": "local mean",
-        }
-    ]
-
-    root.attrs["omero"] = {
-        "version": "0.4",
+    multiscale = {
+        "name": "image",
+        "axes": [
+            {"name": "t", "type": "time", "unit": "second"},
+            {"name": "c", "type": "channel"},
+            {"name": "z", "type": "space", "unit": meta["unit"]},
+            {"name": "y", "type": "space", "unit": meta["unit"]},
+            {"name": "x", "type": "space", "unit": meta["unit"]},
+        ],
+        "datasets": datasets_meta,
+        "type": "local mean",
+    }
+    omero = {
         "name": os.path.basename(out_path),
         "channels": [
             {
@@ -223,54 +331,394 @@ def _create_omezarr_v2(out_path: str, infos: List[LevelInfo], meta: Dict, compre
         "rdefs": {"model": "color", "defaultT": 0, "defaultZ": 0},
     }
 
+    if zarr_format == 2:
+        root.attrs["multiscales"] = [{"version": "0.4", **multiscale}]
+        root.attrs["omero"] = {"version": "0.4", **omero}
+    else:
+        root.attrs["ome"] = {"version": "0.5", "multiscales": [multiscale], "omero": omero}
 
 
-def _init_worker(src_path: str, out_path: str, infos_dicts: List[Dict]) -> None:
-    global G_SRC, G_DST, G_LEVELS
-    os.environ.setdefault("HDF5_USE_FILE_LOCKING", "FALSE")
-    G_SRC = h5py.File(src_path, "r")
-    G_DST = zarr.open_group(out_path, mode="a", zarr_format=2)
-    G_LEVELS = {d["level"]: d for d in infos_dicts}
 
+def _blosc_v3(compressor: Blosc) -> BloscCodec:
+    cfg = compressor.get_config()
+    return BloscCodec(
+        typesize=np.dtype(np.uint16).itemsize,
+        cname=cfg["cname"],
+        clevel=cfg["clevel"],
+        shuffle=["noshuffle", "shuffle", "bitshuffle"][cfg["shuffle"]],
+    )
 
 
-def _copy_z_slab(task: Tuple[int, int, int]) -> int:
-    level, z0, z1 = task
-    info = G_LEVELS[level]
-    src = G_SRC[info["src_path"]]
-    dst = G_DST[str(level)]
-    dz, dy, dx = info["dst_shape_zyx"]
-    cz, cy, cx = info["chunk_zyx"]
 
-    # Copy one z slab over all y/x blocks.
+def _unshuffle(data, itemsize: int, out: Optional[np.ndarray] = None):
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(itemsize, -1)
+    if out is None:
+        return planes.T.tobytes()
+    out.view(np.uint8).reshape(-1, itemsize)[...] = planes.T
+    return out
+
+
+
+def _decode_hdf5_lz4(data, out: Optional[np.ndarray] = None):
+    # HDF5 LZ4 filter framing: >q total size, >i block size, then per block a >i compressed
+    # size and its payload. Blocks that did not compress are stored verbatim.
+    total, block_size = struct.unpack_from(">qi", data, 0)
+    dst = bytearray(total) if out is None else memoryview(out).cast("B")
+    codec = LZ4()
+    pos = 12
+    done = 0
+    while done < total:
+        n = min(block_size, total - done)
+        (csize,) = struct.unpack_from(">i", data, pos)
+        pos += 4
+        payload = data[pos : pos + csize]
+        if csize == n:
+            dst[done : done + n] = payload
+        else:
+            # numcodecs' LZ4 expects a little-endian uncompressed-size header.
+            framed = struct.pack("<i", n) + payload
+            if out is None:
+                dst[done : done + n] = codec.decode(framed)
+            else:
+                codec.decode(framed, out=dst[done : done + n])
+        pos += csize
+        done += n
+    return dst if out is None else out
+
+
+
+def _chunk_decoder(src_ds: h5py.Dataset, fast_copy: bool = False) -> Optional[Callable]:
+    # Returns decode(raw, filter_mask) -> chunk ndarray undoing the dataset's filter pipeline,
+    # or None when a filter is not supported and the regular HDF5 read path must be used.
+    # With fast_copy the last filter decodes straight into a scratch chunk owned by the
+    # decoder, which is only valid until the next call.
+    if src_ds.chunks is None:
+        return None
+    plist = src_ds.id.get_create_plist()
+    steps = []
+    for i in range(plist.get_nfilters()):
+        code = plist.get_filter(i)[0]
+        if code == H5Z_FILTER_SHUFFLE:
+            itemsize = src_ds.dtype.itemsize
+            steps.append(lambda data, out=None, n=itemsize: _unshuffle(data, n, out))
+        elif code == H5Z_FILTER_DEFLATE:
+            steps.append(Zlib().decode)
+        elif code == H5Z_FILTER_BLOSC:
+            steps.append(Blosc().decode)
+        elif code == H5Z_FILTER_LZ4:
+            steps.append(_decode_hdf5_lz4)
+        else:
+            return None
+
+    shape, dtype = src_ds.chunks, src_ds.dtype
+    scratch = np.empty(shape, dtype=dtype) if fast_copy else None
+
+    def decode(raw: bytes, filter_mask: int) -> np.ndarray:
+        # A set bit in the mask means that filter was skipped when the chunk was written.
+        active = [i for i in reversed(range(len(steps))) if not filter_mask & (1 << i)]
+        data = raw
+        for j, i in enumerate(active):
+            data = steps[i](data, scratch if j == len(active) - 1 else None)
+        if isinstance(data, np.ndarray):
+            return data.reshape(shape)
+        return np.frombuffer(data, dtype=dtype).reshape(shape)
+
+    return decode
+
+
+
+def _build_decoders(
+    src_file: h5py.File, infos_dicts: List[Dict], enabled: bool, fast_copy: bool = False
+) -> Dict[int, Optional[Callable]]:
+    if not enabled:
+        return {}
+    return {d["level"]: _chunk_decoder(src_file[d["src_path"]], fast_copy) for d in infos_dicts}
+
+
+
+def _read_tile_chunked(
+    src: h5py.Dataset, decode: Callable, out: np.ndarray, z0: int, z1: int, y0: int, y1: int, x0: int, x1: int
+) -> None:
+    # Read raw HDF5 chunks and decode them in-process, skipping the hyperslab machinery.
+    icz, icy, icx = src.chunks
+    for cz0 in range(z0 - z0 % icz, z1, icz):
+        sz0, sz1 = max(z0, cz0), min(z1, cz0 + icz)
+        for cy0 in range(y0 - y0 % icy, y1, icy):
+            sy0, sy1 = max(y0, cy0), min(y1, cy0 + icy)
+            for cx0 in range(x0 - x0 % icx, x1, icx):
+                sx0, sx1 = max(x0, cx0), min(x1, cx0 + icx)
+                region = out[sz0 - z0 : sz1 - z0, sy0 - y0 : sy1 - y0, sx0 - x0 : sx1 - x0]
+                offset = (cz0, cy0, cx0)
+                if src.id.get_chunk_info_by_coord(offset).byte_offset is None:
+                    # Chunk was never written; HDF5 would return the fill value.
+                    region[...] = src.fillvalue
+                    continue
+                filter_mask, raw = src.id.read_direct_chunk(offset)
+                chunk = decode(raw, filter_mask)
+                region[...] = chunk[sz0 - cz0 : sz1 - cz0, sy0 - cy0 : sy1 - cy0, sx0 - cx0 : sx1 - cx0]
+
+
+
+def _copy_raw_chunks(src: h5py.Dataset, dst: zarr.Array, level: int, z0: int, z1: int, info: Dict) -> None:
+    # IMS and Zarr chunk grids coincide and both use Blosc-LZ4: move the compressed bytes
+    # straight into the Zarr v2 chunk files without a decode/encode round trip.
+    _, dy, dx = info["dst_shape_zyx"]
+    cz, cy, cx = info["chunk_zyx"]
+    root = str(dst.store.root)
     for y0 in range(0, dy, cy):
-        y1 = min(y0 + cy, dy)
         for x0 in range(0, dx, cx):
-            x1 = min(x0 + cx, dx)
-            block = src[z0:z1, y0:y1, x0:x1]
-            dst[0, 0, z0:z1, y0:y1, x0:x1] = block
+            offset = (z0, y0, x0)
+            if src.id.get_chunk_info_by_coord(offset).byte_offset is None:
+                continue
+            filter_mask, raw = src.id.read_direct_chunk(offset)
+            if filter_mask:
+                # Filter was skipped for this chunk; the bytes are not a Blosc frame.
+                y1, x1 = min(y0 + cy, dy), min(x0 + cx, dx)
+                dst[0, 0, z0:z1, y0:y1, x0:x1] = src[z0:z1, y0:y1, x0:x1]
+                continue
+            chunk_path = os.path.join(root, str(level), "0", "0", str(z0 // cz), str(y0 // cy), str(x0 // cx))
+            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+            with open(chunk_path, "wb") as fh:
+                fh.write(raw)
+
+
+
+def _write_chunk_file(dst: zarr.Array, codecs: Tuple, part: np.ndarray, key_coords: Tuple[int, ...]) -> None:
+    # Zarr v2 only: encode one chunk ourselves and write its file, skipping Zarr's setitem path
+    # (selection handling and a second fill-value scan of a chunk we already know is non-empty).
+    # v2 stores edge chunks at full size, so partial chunks are zero-padded first.
+    chunk_shape = dst.chunks[2:]
+    if part.shape != chunk_shape:
+        padded = np.zeros(chunk_shape, dtype=part.dtype)
+        padded[: part.shape[0], : part.shape[1], : part.shape[2]] = part
+        part = padded
+    data = np.ascontiguousarray(part)
+    for codec in codecs:
+        data = codec.encode(data)
+    key = f"{dst.path}/{dst.metadata.encode_chunk_key(key_coords)}"
+    chunk_path = os.path.join(str(dst.store.root), *key.split("/"))
+    os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+    with open(chunk_path, "wb") as fh:
+        fh.write(data)
+
+
+
+def _write_tile(dst: zarr.Array, block: np.ndarray, z0: int, y0: int, x0: int, write_zyx: Tuple[int, int, int]) -> None:
+    # Tiles start on write-unit (chunk or shard) boundaries; hand Zarr exactly one full unit per
+    # setitem so every unit is encoded once, and background-only units are never written.
+    cz, cy, cx = write_zyx
+    nz, ny, nx = block.shape
+    codecs = dst.compressors if dst.metadata.zarr_format == 2 else None
+    for bz in range(0, nz, cz):
+        for by in range(0, ny, cy):
+            for bx in range(0, nx, cx):
+                part = block[bz : bz + cz, by : by + cy, bx : bx + cx]
+                if not part.any():
+                    continue
+                if codecs is not None:
+                    _write_chunk_file(dst, codecs, part, (0, 0, (z0 + bz) // cz, (y0 + by) // cy, (x0 + bx) // cx))
+                    continue
+                pz, py, px = part.shape
+                dst[0, 0, z0 + bz : z0 + bz + pz, y0 + by : y0 + by + py, x0 + bx : x0 + bx + px] = part
+
+
+
+def _iter_tiles(info: Dict) -> Iterator[Tuple[int, int, int, int]]:
+    _, dy, dx = info["dst_shape_zyx"]
+    _, ty, tx = info["tile_zyx"]
+    for y0 in range(0, dy, ty):
+        for x0 in range(0, dx, tx):
+            yield y0, min(y0 + ty, dy), x0, min(x0 + tx, dx)
+
+
+
+def _read_tile(
+    src: h5py.Dataset,
+    decode: Optional[Callable],
+    buf: np.ndarray,
+    z0: int,
+    z1: int,
+    y0: int,
+    y1: int,
+    x0: int,
+    x1: int,
+) -> np.ndarray:
+    shape = (z1 - z0, y1 - y0, x1 - x0)
+    block = buf[: shape[0] * shape[1] * shape[2]].reshape(shape)
+    if decode is not None:
+        _read_tile_chunked(src, decode, block, z0, z1, y0, y1, x0, x1)
+    else:
+        src.read_direct(block, np.s_[z0:z1, y0:y1, x0:x1])
+    return block
+
 
+
+def _task_bytes(info: Dict, z0: int, z1: int) -> int:
+    _, dy, dx = info["dst_shape_zyx"]
     return int((z1 - z0) * dy * dx * np.dtype(np.uint16).itemsize)
 
 
+
+def _alloc_tile_buffer(infos_dicts: List[Dict]) -> np.ndarray:
+    # Flat scratch sized for the largest tile of any level; reused by every task of a worker.
+    max_tile = max(int(np.prod(d["tile_zyx"])) for d in infos_dicts)
+    return np.empty(max_tile, dtype=np.uint16)
+
+
+
+def _configure_blosc(nthreads: int) -> None:
+    # Zarr runs codecs off the main thread, where numcodecs would otherwise stay single-threaded.
+    if nthreads <= 0:
+        return
+    numcodecs_blosc.use_threads = True
+    numcodecs_blosc.set_nthreads(nthreads)
+
+
+
+def _open_level_arrays(out_path: str, infos_dicts: List[Dict]) -> Dict[int, zarr.Array]:
+    # Open each level once; group lookups re-read array metadata on every access.
+    group = zarr.open_group(out_path, mode="a")
+    return {d["level"]: group[str(d["level"])] for d in infos_dicts}
+
+
+
+def _open_source(src_path: str, comm=None) -> h5py.File:
+    # Under MPI every rank opens the shared IMS through the parallel HDF5 driver.
+    if comm is None:
+        return h5py.File(src_path, "r")
+    return h5py.File(src_path, "r", driver="mpio", comm=comm)
+
+
+
+def _init_worker(
+    src_path: str, out_path: str, infos_dicts: List[Dict], fast_chunk_read: bool, fast_copy: bool, blosc_threads: int
+) -> None:
+    os.environ.setdefault("HDF5_USE_FILE_LOCKING", "FALSE")
+    _configure_blosc(blosc_threads)
+    zarr.config.set({"array.write_empty_chunks": False})
+    G_WORKER.src = h5py.File(src_path, "r")
+    G_WORKER.arrays = _open_level_arrays(out_path, infos_dicts)
+    G_WORKER.levels = {d["level"]: d for d in infos_dicts}
+    # Two tile buffers: the next tile is read into one while the other is compressed/written.
+    G_WORKER.buf = _alloc_tile_buffer(infos_dicts)
+    G_WORKER.spare_buf = _alloc_tile_buffer(infos_dicts)
+    G_WORKER.prefetch = ThreadPoolExecutor(max_workers=1)
+    G_WORKER.decoders = _build_decoders(G_WORKER.src, infos_dicts, fast_chunk_read, fast_copy)
+
+
+
+def _copy_z_slab(task: Tuple[int, int, int]) -> int:
+    w = G_WORKER
+    return _copy_z_slab_local(w.src, w.arrays, w.levels, task, w.buf, w.decoders, w.spare_buf, w.prefetch)
+
+
 def _copy_z_slab_local(
-    src_file: h5py.File, dst_group: zarr.Group, level_map: Dict[int, Dict], task: Tuple[int, int, int]
+    src_file: h5py.File,
+    dst_arrays: Dict[int, zarr.Array],
+    level_map: Dict[int, Dict],
+    task: Tuple[int, int, int],
+    buf: np.ndarray,
+    decoders: Dict[int, Optional[Callable]],
+    spare_buf: Optional[np.ndarray] = None,
+    prefetch: Optional[ThreadPoolExecutor] = None,
 ) -> int:
     level, z0, z1 = task
     info = level_map[level]
     src = src_file[info["src_path"]]
-    dst = dst_group[str(level)]
-    _, dy, dx = info["dst_shape_zyx"]
-    _, cy, cx = info["chunk_zyx"]
-
-    for y0 in range(0, dy, cy):
-        y1 = min(y0 + cy, dy)
-        for x0 in range(0, dx, cx):
-            x1 = min(x0 + cx, dx)
-            block = src[z0:z1, y0:y1, x0:x1]
-            dst[0, 0, z0:z1, y0:y1, x0:x1] = block
-
-    return int((z1 - z0) * dy * dx * np.dtype(np.uint16).itemsize)
+    dst = dst_arrays[level]
+    decode = decoders.get(level)
+
+    if info["raw_copy"]:
+        _copy_raw_chunks(src, dst, level, z0, z1, info)
+        return _task_bytes(info, z0, z1)
+
+    # Copy one z slab over all y/x tiles. Tiles are aligned to both the IMS and Zarr chunk
+    # grids and read straight into a contiguous view of the worker's scratch buffer.
+    if prefetch is None:
+        for y0, y1, x0, x1 in _iter_tiles(info):
+            block = _read_tile(src, decode, buf, z0, z1, y0, y1, x0, x1)
+            # Background-only chunks stay unwritten; missing chunks read back as the zero fill value.
+            _write_tile(dst, block, z0, y0, x0, info["write_zyx"])
+        return _task_bytes(info, z0, z1)
+
+    # Double-buffered: the prefetch thread reads tile i+1 into one buffer while this thread
+    # writes tile i from the other.
+    tiles = list(_iter_tiles(info))
+    pending = prefetch.submit(_read_tile, src, decode, buf, z0, z1, *tiles[0])
+    for i, (y0, _, x0, _) in enumerate(tiles):
+        block = pending.result()
+        if i + 1 < len(tiles):
+            buf, spare_buf = spare_buf, buf
+            pending = prefetch.submit(_read_tile, src, decode, buf, z0, z1, *tiles[i + 1])
+        _write_tile(dst, block, z0, y0, x0, info["write_zyx"])
+
+    return _task_bytes(info, z0, z1)
+
+
+
+def _copy_tasks_serial(
+    src_file: h5py.File,
+    dst_arrays: Dict[int, zarr.Array],
+    level_map: Dict[int, Dict],
+    tasks: List[Tuple[int, int, int]],
+    decoders: Dict[int, Optional[Callable]],
+) -> Iterator[Tuple[int, int, int]]:
+    buf = _alloc_tile_buffer(list(level_map.values()))
+    for task in tasks:
+        _copy_z_slab_local(src_file, dst_arrays, level_map, task, buf, decoders)
+        yield task
+
+
+
+def _copy_tasks_pipelined(
+    src_file: h5py.File,
+    dst_arrays: Dict[int, zarr.Array],
+    level_map: Dict[int, Dict],
+    tasks: List[Tuple[int, int, int]],
+    decoders: Dict[int, Optional[Callable]],
+    encode_threads: int,
+) -> Iterator[Tuple[int, int, int]]:
+    # The calling thread reads tiles from HDF5 while encode_threads threads compress and write
+    # the previous ones. A small ring of scratch buffers bounds memory and backpressures the
+    # reader. Yields each task once all of its tiles are written.
+    free = [_alloc_tile_buffer(list(level_map.values())) for _ in range(2 * encode_threads + 1)]
+    pending: Deque = deque()
+    tiles_left: Dict[Tuple[int, int, int], int] = {}
+
+    def finish_oldest() -> Optional[Tuple[int, int, int]]:
+        fut, buf, task = pending.popleft()
+        fut.result()
+        free.append(buf)
+        tiles_left[task] -= 1
+        return task if tiles_left[task] == 0 else None
+
+    with ThreadPoolExecutor(max_workers=encode_threads) as ex:
+        for task in tasks:
+            level, z0, z1 = task
+            info = level_map[level]
+            src = src_file[info["src_path"]]
+            dst = dst_arrays[level]
+            if info["raw_copy"]:
+                _copy_raw_chunks(src, dst, level, z0, z1, info)
+                yield task
+                continue
+
+            tiles = list(_iter_tiles(info))
+            tiles_left[task] = len(tiles)
+            for y0, y1, x0, x1 in tiles:
+                while not free:
+                    done = finish_oldest()
+                    if done is not None:
+                        yield done
+                buf = free.pop()
+                block = _read_tile(src, decoders.get(level), buf, z0, z1, y0, y1, x0, x1)
+                fut = ex.submit(_write_tile, dst, block, z0, y0, x0, info["write_zyx"])
+                pending.append((fut, buf, task))
+
+        while pending:
+            done = finish_oldest()
+            if done is not None:
+                yield done
 
 
 
@@ -279,44 +727,127 @@ def _build_tasks(infos: List[LevelInfo]) -> Tuple[List[Tuple[int, int, int]], in
     total_bytes = 0
     for info in infos:
         z, y, x = info.dst_shape_zyx
-        cz, _, _ = info.chunk_zyx
+        # Slabs follow the tile depth, a multiple of the Zarr write unit (shard or chunk) that is
+        # also aligned to the IMS chunk in Z where possible, so tasks never share a shard and no
+        # IMS chunk is decoded by two tasks.
+        tz, _, _ = info.tile_zyx
         total_bytes += z * y * x * np.dtype(np.uint16).itemsize
-        for z0 in range(0, z, cz):
-            z1 = min(z0 + cz, z)
-            tasks.append((info.level, z0, z1))
+        starts = np.arange(0, z, tz)
+        stops = np.minimum(starts + tz, z)
+        tasks.extend(zip([info.level] * len(starts), starts.tolist(), stops.tolist()))
     return tasks, total_bytes
 
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Fast parallel IMS to OME-Zarr v2 converter")
+    parser = argparse.ArgumentParser(description="Fast parallel IMS to OME-Zarr converter")
     parser.add_argument("--input", required=True, help="Input .ims path")
     parser.add_argument("--output", required=True, help="Output OME-Zarr directory")
-    parser.add_argument("--workers", type=int, default=8, help="Number of worker processes")
+    parser.add_argument("--workers", type=int, default=8, help="Number of worker processes (or threads with --exec thread)")
+    parser.add_argument(
+        "--exec",
+        choices=["process", "thread"],
+        default="process",
+        help="Worker pool type. Threads share one interpreter and avoid per-process HDF5 caches; "
+        "they scale best with --fast-chunk-read since decoding then runs outside the HDF5 lock.",
+    )
     parser.add_argument("--chunk-z", type=int, default=16)
     parser.add_argument("--chunk-y", type=int, default=1024)
     parser.add_argument("--chunk-x", type=int, default=1024)
     parser.add_argument("--compression", choices=["none", "lz4", "zstd"], default="none")
     parser.add_argument("--clevel", type=int, default=1)
+    parser.add_argument(
+        "--v2-compat",
+        action="store_true",
+        help="Write unsharded Zarr v2 / OME-NGFF 0.4 (one file per chunk) instead of sharded Zarr v3 / OME-NGFF 0.5.",
+    )
+    parser.add_argument(
+        "--blosc-threads",
+        type=int,
+        default=0,
+        help="Blosc threads per worker process (0 = cpu_count // workers). Total Blosc threads are "
+        "workers * blosc-threads and should match the physical core count. Ignored when several threads "
+        "of a process use Blosc: --exec thread with --workers > 1, --encode-threads > 1, or "
+        "--fast-chunk-read (the tile reader decodes while the writer encodes) unless --encode-threads 0 "
+        "in the single-process path.",
+    )
     parser.add_argument(
         "--max-tasks",
         type=int,
         default=0,
         help="Benchmark mode: only process the first N z-slab tasks (0 = all tasks).",
     )
+    parser.add_argument(
+        "--fast-chunk-read",
+        action="store_true",
+        help="Read raw IMS chunks and decode them in-process (deflate/shuffle/Blosc/LZ4) instead of HDF5 slicing.",
+    )
+    parser.add_argument(
+        "--fast-copy",
+        action="store_true",
+        help="With --fast-chunk-read: decode each IMS chunk straight into a reused per-worker buffer "
+        "instead of a fresh bytes object.",
+    )
+    parser.add_argument(
+        "--mpi",
+        action="store_true",
+        help="Run one converter per MPI rank (mpirun -n N ...): ranks share the IMS through the "
+        "mpio HDF5 driver and split the z-slab tasks. --workers is ignored; each rank is one worker.",
+    )
+    parser.add_argument(
+        "--encode-threads",
+        type=int,
+        default=1,
+        help="With --workers 1, and on every rank under --mpi: threads that compress and write tiles "
+        "while the next ones are read (0 = read and write on one thread). Holds 2 * encode-threads + 1 "
+        "tile buffers of up to 256 MiB each.",
+    )
     args = parser.parse_args()
+    if args.fast_copy and not args.fast_chunk_read:
+        parser.error("--fast-copy requires --fast-chunk-read")
+
+    comm = None
+    rank = 0
+    if args.mpi:
+        try:
+            from mpi4py import MPI
+        except ImportError as exc:
+            raise RuntimeError("--mpi requires mpi4py and an MPI-enabled h5py build") from exc
+        comm = MPI.COMM_WORLD
+        rank = comm.Get_rank()
 
     t0 = time.time()
     chunk_zyx = (args.chunk_z, args.chunk_y, args.chunk_x)
 
-    infos, meta = _build_level_infos(args.input, chunk_zyx)
-    _create_omezarr_v2(
-        args.output,
-        infos,
-        meta,
-        compression=("none" if args.compression == "none" else args.compression),
-        clevel=args.clevel,
-    )
+    zarr_format = 2 if args.v2_compat else 3
+    infos, meta = _build_level_infos(args.input, chunk_zyx, sharded=zarr_format == 3)
+
+    clevel = args.clevel
+    shuffle = Blosc.BITSHUFFLE
+    ims_lz4 = infos[0].ims_blosc_lz4
+    if args.compression == "lz4" and ims_lz4 is not None and zarr_format == 2:
+        # Adopt the IMS Blosc parameters so chunk-aligned levels can be copied without recompressing.
+        clevel, shuffle = ims_lz4
+        for info in infos:
+            info.raw_copy = info.ims_blosc_lz4 == ims_lz4 and info.chunk_zyx == info.ims_chunk_zyx
+        if rank == 0:
+            print(f"IMS is Blosc-LZ4 (clevel={clevel}, shuffle={shuffle}); raw chunk copy for levels "
+                  f"{[i.level for i in infos if i.raw_copy]}", flush=True)
+    elif args.compression == "lz4" and ims_lz4 is not None and rank == 0:
+        print("IMS is Blosc-LZ4; raw chunk copy needs Zarr v2 output (--v2-compat), recompressing.", flush=True)
+
+    if rank == 0:
+        _create_omezarr(
+            args.output,
+            infos,
+            meta,
+            compression=("none" if args.compression == "none" else args.compression),
+            clevel=clevel,
+            shuffle=shuffle,
+            zarr_format=zarr_format,
+        )
+    if comm is not None:
+        comm.Barrier()
 
     tasks, total_bytes = _build_tasks(infos)
     if args.max_tasks and args.max_tasks > 0:
@@ -334,31 +865,71 @@ def main() -> None:
             "src_path": i.src_path,
             "dst_shape_zyx": i.dst_shape_zyx,
             "chunk_zyx": i.chunk_zyx,
+            "write_zyx": i.write_zyx,
+            "tile_zyx": i.tile_zyx,
+            "raw_copy": i.raw_copy,
         }
         for i in infos
     ]
 
+    if comm is not None:
+        # Static round-robin split; z-slabs never share a chunk or shard, so ranks write disjoint
+        # files. Progress below is per rank.
+        tasks = tasks[rank :: comm.Get_size()]
+        info_by_level = {d["level"]: d for d in infos_dicts}
+        total_bytes = sum(_task_bytes(info_by_level[level], z0, z1) for (level, z0, z1) in tasks)
+        # Ranks on the same node share its cores.
+        local_workers = comm.Split_type(MPI.COMM_TYPE_SHARED).Get_size()
+    else:
+        local_workers = args.workers
+
+    blosc_threads = args.blosc_threads or max(1, (os.cpu_count() or 1) // max(1, local_workers))
+    if comm is not None or args.workers <= 1:
+        concurrent_blosc = args.encode_threads > 1 or (args.encode_threads == 1 and args.fast_chunk_read)
+    else:
+        concurrent_blosc = args.exec == "thread" or args.fast_chunk_read
+    if concurrent_blosc:
+        # Several threads of a process run Blosc at once (pool threads, encoder threads, or the
+        # tile reader decoding while the writer encodes). They keep per-call Blosc contexts; a
+        # shared global Blosc pool would serialize them behind its mutex.
+        blosc_threads = 0
+
     bytes_done = 0
     last_report = time.time()
 
-    if args.workers <= 1:
-        with h5py.File(args.input, "r") as src_file:
-            dst_group = zarr.open_group(args.output, mode="a", zarr_format=2)
+    log_prefix = f"rank={rank} " if comm is not None else ""
+    if comm is not None or args.workers <= 1:
+        zarr.config.set({"array.write_empty_chunks": False})
+        _configure_blosc(blosc_threads)
+        with _open_source(args.input, comm) as src_file:
+            dst_arrays = _open_level_arrays(args.output, infos_dicts)
             level_map = {d["level"]: d for d in infos_dicts}
-            for idx, task in enumerate(tasks, 1):
-                bytes_done += _copy_z_slab_local(src_file, dst_group, level_map, task)
+            decoders = _build_decoders(src_file, infos_dicts, args.fast_chunk_read, args.fast_copy)
+            if args.encode_threads > 0:
+                done_tasks = _copy_tasks_pipelined(src_file, dst_arrays, level_map, tasks, decoders, args.encode_threads)
+            else:
+                done_tasks = _copy_tasks_serial(src_file, dst_arrays, level_map, tasks, decoders)
+            for idx, (level, z0, z1) in enumerate(done_tasks, 1):
+                bytes_done += _task_bytes(level_map[level], z0, z1)
                 now = time.time()
                 if now - last_report >= 10 or idx == len(tasks):
                     dt = max(now - t0, 1e-6)
                     mbps = (bytes_done / 1_048_576.0) / dt
                     pct = 100.0 * bytes_done / max(total_bytes, 1)
                     print(
-                        f"progress={pct:.3f}% bytes_done={bytes_done} total_bytes={total_bytes} mbps={mbps:.2f} tasks={idx}/{len(tasks)}",
+                        f"{log_prefix}progress={pct:.3f}% bytes_done={bytes_done} total_bytes={total_bytes} "
+                        f"mbps={mbps:.2f} tasks={idx}/{len(tasks)}",
                         flush=True,
                     )
                     last_report = now
     else:
-        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.input, args.output, infos_dicts)) as ex:
+        os.environ.setdefault("HDF5_USE_FILE_LOCKING", "FALSE")
+        if args.exec == "thread":
+            executor_cls, pool_kwargs = ThreadPoolExecutor, {}
+        else:
+            # Spawned, not forked: numcodecs ignores use_threads in forked children.
+            executor_cls, pool_kwargs = ProcessPoolExecutor, {"mp_context": multiprocessing.get_context("spawn")}
+        with executor_cls(max_workers=args.workers, initializer=_init_worker, initargs=(args.input, args.output, infos_dicts, args.fast_chunk_read, args.fast_copy, blosc_threads), **pool_kwargs) as ex:
             futures = [ex.submit(_copy_z_slab, task) for task in tasks]
             for idx, fut in enumerate(as_completed(futures), 1):
                 bytes_done += fut.result()
@@ -374,15 +945,27 @@ def main() -> None:
                     last_report = now
 
     elapsed = time.time() - t0
+    if comm is not None:
+        bytes_done = comm.reduce(bytes_done, op=MPI.SUM, root=0)
+        elapsed = comm.reduce(elapsed, op=MPI.MAX, root=0)
+        if rank != 0:
+            return
     mbps = (bytes_done / 1_048_576.0) / max(elapsed, 1e-6)
 
     stats = {
         "input": args.input,
         "output": args.output,
-        "workers": args.workers,
+        # Under MPI each rank is one worker and --workers is ignored.
+        "workers": comm.Get_size() if comm is not None else args.workers,
+        "exec": args.exec,
+        "mpi_ranks": comm.Get_size() if comm is not None else 0,
+        "blosc_threads": blosc_threads,
         "chunk_zyx": [args.chunk_z, args.chunk_y, args.chunk_x],
         "max_tasks": args.max_tasks,
         "compression": args.compression,
+        "zarr_format": zarr_format,
+        "fast_chunk_read": args.fast_chunk_read,
+        "fast_copy": args.fast_copy,
         "elapsed_seconds": elapsed,
         "bytes_copied": bytes_done,
         "throughput_MBps": mbps,
@@ -392,6 +975,10 @@ def main() -> None:
                 "src_shape_zyx": list(i.src_shape_zyx),
                 "dst_shape_zyx": list(i.dst_shape_zyx),
                 "chunk_zyx": list(i.chunk_zyx),
+                "write_zyx": list(i.write_zyx),
+                "ims_chunk_zyx": list(i.ims_chunk_zyx),
+                "tile_zyx": list(i.tile_zyx),
+                "raw_copy": i.raw_copy,
             }
             for i in infos
         ],
@@ -1,11 +1,16 @@
 import argparse
+import hashlib
+import json
+import math
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Prefer Qt6 at runtime to avoid repeated Qt5Core crashes seen on this machine.
 os.environ.setdefault("QT_API", "pyside6")
 
 import numpy as np
 import napari
+from napari.qt.threading import thread_worker
 
 RENDER_MODES = (
     "attenuated_mip",
@@ -17,6 +22,19 @@ RENDER_MODES = (
     "additive",
 )
 
+# Z/Y/X strides of the sparse sample used for contrast estimation.
+Z_STEP, Y_STEP, X_STEP = 16, 32, 32
+SAMPLE_SPATIAL_INDEX = (slice(None, None, Z_STEP), slice(None, None, Y_STEP), slice(None, None, X_STEP))
+# MIP renderings only ever show the max along Z, so their sample keeps every Z plane.
+MIP_SPATIAL_INDEX = (slice(None), slice(None, None, Y_STEP), slice(None, None, X_STEP))
+MIP_MODES = ("mip", "attenuated_mip")
+# Preview levels up to this many bytes are read whole and used unstrided for contrast.
+PREVIEW_RAM_BUDGET = 128 << 20
+# Contrast quantiles, shared by every estimator.
+CONTRAST_QUANTILES = (0.01, 0.999)
+# Bytes of chunks (or shards) being histogrammed at once by --tile-stats.
+TILE_STATS_READ_BUDGET = 1 << 30
+
 
 def _count_multiscale_levels(layer_data):
     try:
@@ -37,10 +55,7 @@ def _level_voxels(level_data):
     shape = getattr(level_data, "shape", None)
     if not shape:
         return 0
-    vox = 1
-    for d in shape:
-        vox *= int(d)
-    return int(vox)
+    return int(np.multiply.reduce(shape, dtype=np.int64))
 
 
 def _choose_safe_3d_level(layer_data, max_voxels=300_000_000):
@@ -48,29 +63,20 @@ def _choose_safe_3d_level(layer_data, max_voxels=300_000_000):
     if n_levels <= 0:
         return None
 
-    # Find the highest-detail level that stays under the voxel budget.
-    for level in range(n_levels):
-        try:
-            if _level_voxels(layer_data[level]) <= max_voxels:
-                return level
-        except Exception:
-            continue
-    return n_levels - 1
-
+    # Find the highest-detail level that stays under the voxel budget, counting all levels in
+    # one reduction. Levels without a shape are skipped.
+    shapes = [getattr(layer_data[level], "shape", None) for level in range(n_levels)]
+    levels = [level for level, shape in enumerate(shapes) if shape]
+    if not levels:
+        return n_levels - 1
+    vox = np.prod(np.asarray([shapes[level] for level in levels], dtype=np.int64), axis=1)
+    fits = np.flatnonzero(vox <= max_voxels)
+    return levels[int(fits[0])] if fits.size else n_levels - 1
 
-def _estimate_xy_decimated_voxels(shape, y_step, x_step):
-    if not shape or len(shape) < 2:
-        return 0
 
-    vox = 1
-    for axis, dim in enumerate(shape):
-        d = int(dim)
-        if axis == len(shape) - 2:
-            d = (d + int(y_step) - 1) // int(y_step)
-        elif axis == len(shape) - 1:
-            d = (d + int(x_step) - 1) // int(x_step)
-        vox *= d
-    return int(vox)
+def _xy_decimated_voxels(leading, height, width, y_step, x_step):
+    # Voxels left after striding Y/X; `leading` is the product of all non-YX dims.
+    return leading * ((height + y_step - 1) // y_step) * ((width + x_step - 1) // x_step)
 
 
 def _select_single_scale_level_for_display(viewer, layer, level):
@@ -82,11 +88,12 @@ def _select_single_scale_level_for_display(viewer, layer, level):
     selected = layer.data[level]
     scale = layer.scale
     try:
+        factors = layer.downsample_factors[level]
+    except (AttributeError, IndexError):
+        factors = None
+    if factors is not None:
         # Preserve world scale when extracting a lower-resolution multiscale level.
-        factors = np.asarray(layer.downsample_factors[level], dtype=float)
-        scale = tuple(np.asarray(layer.scale, dtype=float) * factors)
-    except Exception:
-        pass
+        scale = tuple(float(s) * float(f) for s, f in zip(layer.scale, factors))
 
     new_layer = viewer.add_image(
         selected,
@@ -126,16 +133,23 @@ def _select_preserve_z_level_for_display(viewer, layer, level, max_voxels=300_00
         1, int(round(float(base_shape[x_axis]) / max(1.0, float(target_shape[x_axis]))))
     )
 
-    vox = _estimate_xy_decimated_voxels(base_shape, y_factor, x_factor)
+    leading = int(np.prod(base_shape[:-2], dtype=np.int64))
+    height = int(base_shape[y_axis])
+    width = int(base_shape[x_axis])
+    vox = _xy_decimated_voxels(leading, height, width, y_factor, x_factor)
     if max_voxels and vox > max_voxels:
+        # Isotropic start: both factors scaled by sqrt(vox / budget). Then the exact fix-up: keep
+        # the rows y_factor leaves and take the smallest x step whose columns fit the rest of the
+        # per-plane budget.
+        plane_budget = max(1, max_voxels // leading)
         scale_up = (float(vox) / float(max_voxels)) ** 0.5
-        y_factor = max(y_factor, int(np.ceil(y_factor * scale_up)))
-        x_factor = max(x_factor, int(np.ceil(x_factor * scale_up)))
-        while _estimate_xy_decimated_voxels(base_shape, y_factor, x_factor) > max_voxels:
-            if y_factor <= x_factor:
-                y_factor += 1
-            else:
-                x_factor += 1
+        y_factor = max(y_factor, math.ceil(y_factor * scale_up))
+        x_factor = max(x_factor, math.ceil(x_factor * scale_up))
+        rows = -(-height // y_factor)
+        if rows > plane_budget:
+            y_factor = -(-height // plane_budget)
+            rows = -(-height // y_factor)
+        x_factor = max(x_factor, -(-width // (plane_budget // rows)))
 
     index = [slice(None)] * len(base_shape)
     index[y_axis] = slice(None, None, y_factor)
@@ -176,27 +190,340 @@ def _pick_preview_array(layer_data):
     return layer_data[min(2, n_levels - 1)]
 
 
-def _estimate_contrast(arr):
+def _backing_zarr_array(arr):
+    # napari-ome-zarr wraps each level with da.from_zarr, which keeps the zarr.Array in the graph
+    # under "original-<name>". Only a level as loaded qualifies; sliced arrays have a new name.
+    graph = getattr(arr, "dask", None)
+    name = getattr(arr, "name", None)
+    if graph is None or name is None:
+        return None
+    key = f"original-{name}"
+    layers = getattr(graph, "layers", None)
+    mapping = layers.get(key) if layers is not None else graph
+    try:
+        original = mapping.get(key) if mapping is not None else None
+    except Exception:
+        return None
+    # Newer dask wraps graph constants in a node holding them as .value.
+    original = getattr(original, "value", original)
+    if hasattr(original, "get_orthogonal_selection") and tuple(original.shape) == tuple(arr.shape):
+        return original
+    return None
+
+
+def _write_unit(zarray):
+    # Shards are the unit stored per key in sharded Zarr v3, and what zarr.Array.blocks indexes;
+    # otherwise chunks.
+    return zarray.shards if getattr(zarray, "shards", None) is not None else zarray.chunks
+
+
+def _read_zarr_sample(zarray, index):
+    # Strided read split at Z chunk (or shard) boundaries, one part per thread, so the parts'
+    # chunk reads and decodes overlap. index is leading ints followed by the Z/Y/X slices.
+    z_axis = len(index) - 3
+    z_sel = index[z_axis]
+    unit = _write_unit(zarray)
+    zs = np.arange(zarray.shape[z_axis])[z_sel]
+    if zs.size == 0:
+        return zarray.get_orthogonal_selection(index)
+    _, starts = np.unique(zs // int(unit[z_axis]), return_index=True)
+    bounds = list(zip(starts.tolist(), starts[1:].tolist() + [zs.size]))
+    if len(bounds) == 1:
+        return zarray.get_orthogonal_selection(index)
+
+    def read_part(bound):
+        i0, i1 = bound
+        part = list(index)
+        part[z_axis] = slice(int(zs[i0]), int(zs[i1 - 1]) + 1, z_sel.step)
+        return zarray.get_orthogonal_selection(tuple(part))
+
+    with ThreadPoolExecutor(max_workers=min(len(bounds), os.cpu_count() or 1)) as ex:
+        parts = list(ex.map(read_part, bounds))
+    return np.concatenate(parts, axis=0)
+
+
+def _histogram_quantiles(sample, quantiles, bins=4096):
+    # Chunk-parallel contrast estimate for Dask-backed data: one histogram reduction instead of
+    # materializing the sample and sorting it twice. Returns None when the data has no usable range.
+    import dask
+    import dask.array as da
+
+    dtype = np.dtype(sample.dtype)
+    if dtype.kind in "ui" and dtype.itemsize <= 2:
+        # One bin per representable value: exact, and no min/max pass needed.
+        info = np.iinfo(dtype)
+        bins = int(info.max) - int(info.min) + 1
+        value_range = (int(info.min), int(info.max) + 1)
+    else:
+        vmin, vmax = dask.compute(sample.min(), sample.max())
+        vmin, vmax = float(vmin), float(vmax)
+        if not (np.isfinite(vmin) and np.isfinite(vmax)):
+            return None
+        if vmax <= vmin:
+            return [vmin] * len(quantiles)
+        value_range = (vmin, vmax)
+
+    counts, edges = da.histogram(sample, bins=bins, range=value_range)
+    if dtype.kind in "ui" and dtype.itemsize <= 2:
+        values = edges[:-1]
+    else:
+        values = 0.5 * (edges[:-1] + edges[1:])
+    return _cdf_quantiles(counts.compute(), values, quantiles)
+
+
+def _cdf_quantiles(counts, values, quantiles):
+    # Quantiles read off a histogram's cumulative counts; values[i] stands for bin i.
+    cdf = np.cumsum(counts)
+    if cdf[-1] <= 0:
+        return None
+    idx = np.searchsorted(cdf, np.asarray(quantiles) * cdf[-1], side="left")
+    return [float(values[min(i, len(values) - 1)]) for i in idx]
+
+
+def _fits_in_ram(arr, budget=PREVIEW_RAM_BUDGET):
+    return _level_voxels(arr) * np.dtype(arr.dtype).itemsize <= budget
+
+
+def _estimate_contrast(arr, mode=None):
     # Sample sparsely to avoid loading huge volumes into RAM.
     if arr.ndim < 3:
         raise ValueError(f"Expected image data with >=3 dims, got {arr.ndim}")
 
     # Keep the first index for leading dims (e.g., t/c), subsample spatial z/y/x.
-    index = []
-    for axis in range(arr.ndim):
-        if axis < arr.ndim - 3:
-            index.append(0)
-        elif axis == arr.ndim - 3:
-            index.append(slice(None, None, 16))
-        else:
-            index.append(slice(None, None, 32))
-
-    sample = arr[tuple(index)]
+    mip = mode in MIP_MODES
+    if isinstance(arr, np.ndarray):
+        # Already in memory: every voxel is as cheap as a strided sample.
+        spatial = (slice(None),) * 3
+    else:
+        spatial = MIP_SPATIAL_INDEX if mip else SAMPLE_SPATIAL_INDEX
+    index = (0,) * (arr.ndim - 3) + spatial
+
+    zarray = _backing_zarr_array(arr)
+    if zarray is not None:
+        # Read the strided sample straight from Zarr: only intersecting chunks are decoded and
+        # no Dask graph is built.
+        sample = _read_zarr_sample(zarray, index)
+    else:
+        sample = arr[index]
+    if mip:
+        # Z max projection; chunk-parallel when the sample is still a Dask array.
+        sample = sample.max(axis=0)
+    if hasattr(sample, "dask"):
+        limits = _histogram_quantiles(sample, CONTRAST_QUANTILES)
+        if limits is not None:
+            lo, hi = limits
+            if hi <= lo:
+                hi = lo + 1.0
+            return lo, hi
     if hasattr(sample, "compute"):
         sample = sample.compute()
     sample = np.asarray(sample)
-    lo = float(np.percentile(sample, 1.0))
-    hi = float(np.percentile(sample, 99.9))
+    if sample.dtype == np.float64:
+        # Half the memory traffic for the partition; float32 is ample for display limits.
+        sample = sample.astype(np.float32, copy=False)
+    if sample.dtype in (np.uint8, np.uint16) and sample.size:
+        # Counting-sort percentiles: one O(N) pass with no float conversion.
+        counts = np.bincount(sample.ravel(), minlength=1 << (8 * sample.dtype.itemsize))
+        lo, hi = _cdf_quantiles(counts, np.arange(counts.size), CONTRAST_QUANTILES)
+    else:
+        lo, hi = (float(v) for v in np.percentile(sample, [100 * q for q in CONTRAST_QUANTILES]))
+    if hi <= lo:
+        hi = lo + 1.0
+    return lo, hi
+
+
+# Attribute names per layer class, so optional-feature probes don't go through napari's evented
+# property descriptors on every check.
+_LAYER_CAPS = {}
+
+
+def _layer_caps(layer):
+    caps = _LAYER_CAPS.get(type(layer))
+    if caps is None:
+        caps = _LAYER_CAPS[type(layer)] = frozenset(dir(layer))
+    return caps
+
+
+def _dtype_contrast(arr):
+    # Percentile-free limits for integer data: the full uint8 range, or for uint16 the bit depth
+    # implied by the maximum of `arr` (12-bit when it is empty). None for other dtypes.
+    dtype = np.dtype(arr.dtype)
+    if dtype == np.uint8:
+        return 0.0, 255.0
+    if dtype == np.uint16:
+        peak = int(np.asarray(arr.max()))
+        return 0.0, float((1 << peak.bit_length()) - 1 if peak > 0 else 4095)
+    return None
+
+
+def _dask_threads():
+    # Run Dask graphs on a thread pool sized to the machine; some setups otherwise fall back to
+    # the synchronous scheduler. dask is imported lazily, only when a context is needed.
+    import dask
+
+    return dask.config.set(scheduler="threads", num_workers=os.cpu_count())
+
+
+@thread_worker
+def _compute_contrast(preview, mode=None, tile_stats=None, dtype_source=None):
+    # The Dask config is set here rather than around worker.start(): dask.config.set is global
+    # and main() would leave the context before the worker reads anything.
+    with _dask_threads():
+        if dtype_source is not None:
+            limits = _dtype_contrast(dtype_source)
+            if limits is not None:
+                return limits
+        if tile_stats is not None:
+            limits = _tile_stats_contrast(preview, *tile_stats)
+            if limits is not None:
+                return limits
+        if not isinstance(preview, np.ndarray) and _fits_in_ram(preview):
+            # One bulk read of a small pyramid level beats a strided virtual slice.
+            preview = np.asarray(preview)
+        return _estimate_contrast(preview, mode)
+
+
+def _apply_contrast(layer, lo, hi, view, rendering):
+    layer.contrast_limits = (lo, hi)
+    if view == "3d" and rendering == "iso" and "iso_threshold" in _layer_caps(layer):
+        try:
+            layer.iso_threshold = 0.5 * (lo + hi)
+        except Exception:
+            pass
+    print(f"Contrast limits set to: [{lo:.3f}, {hi:.3f}]")
+
+
+def _contrast_cache_path(path):
+    return os.path.join(path, ".napari_preview_cache.json")
+
+
+def _metadata_mtimes(path):
+    # Zarr v3 keeps root metadata in zarr.json, v2 in .zattrs.
+    mtimes = []
+    for name in ("zarr.json", ".zattrs"):
+        meta_path = os.path.join(path, name)
+        if os.path.exists(meta_path):
+            mtimes.append(os.path.getmtime(meta_path))
+    return mtimes
+
+
+def _contrast_cache_key(path, layer_data, args):
+    # Fingerprint of the dataset (root metadata mtime, base shape/dtype) and of the options that
+    # change which level is displayed.
+    n_levels = _count_multiscale_levels(layer_data)
+    base = layer_data[0] if n_levels > 0 else layer_data
+    parts = (
+        path,
+        _metadata_mtimes(path),
+        [int(d) for d in base.shape],
+        str(base.dtype),
+        args.view,
+        args.rendering,
+        args.pyramid_level,
+        args.preserve_z,
+        args.max_voxels,
+        args.no_preview_contrast,
+        args.tile_stats,
+    )
+    return hashlib.blake2b(json.dumps(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load_contrast_cache(cache_path, key):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as fh:
+            cached = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    return cached
+
+
+def _save_contrast_cache(cache_path, key, lo, hi, level):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"key": key, "lo": lo, "hi": hi, "level": level}, fh)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Read-only datasets simply run uncached.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _tile_stats_path(path):
+    return os.path.join(path, ".contrast_stats.zarr")
+
+
+def _tile_stats_key(path, preview):
+    parts = (path, _metadata_mtimes(path), [int(d) for d in preview.shape], str(preview.dtype))
+    return hashlib.blake2b(json.dumps(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _blocks_histogram(zarray, coords, bins):
+    counts = np.zeros(bins, dtype=np.int64)
+    for c in coords:
+        counts += np.bincount(np.asarray(zarray.blocks[c]).ravel(), minlength=bins)
+    return counts
+
+
+def _load_tile_stats(stats_path, key):
+    import zarr
+
+    try:
+        group = zarr.open_group(stats_path, mode="r")
+    except Exception:
+        return None
+    if group.attrs.get("key") != key or "hist" not in group or group["hist"].ndim != 1:
+        return None
+    return group["hist"][...]
+
+
+def _build_tile_stats(zarray, stats_path, key):
+    # Histogram of the whole preview level, one bin per value, accumulated chunk by chunk (or
+    # shard by shard). Each worker sums its share of the blocks, so memory is one block read plus
+    # one histogram per worker, and the worker count keeps the block reads within
+    # TILE_STATS_READ_BUDGET.
+    import zarr
+
+    bins = 1 << (8 * zarray.dtype.itemsize)
+    unit = _write_unit(zarray)
+    grid = tuple(math.ceil(n / c) for n, c in zip(zarray.shape, unit))
+    coords = list(np.ndindex(*grid))
+    block_bytes = math.prod(unit) * zarray.dtype.itemsize
+    workers = max(1, min(len(coords), os.cpu_count() or 1, TILE_STATS_READ_BUDGET // block_bytes))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        shares = [coords[i::workers] for i in range(workers)]
+        parts = ex.map(lambda share: _blocks_histogram(zarray, share, bins), shares)
+        hist = sum(parts)
+    try:
+        group = zarr.open_group(stats_path, mode="w")
+        group.create_array("hist", data=hist)
+        group.attrs["key"] = key
+    except OSError:
+        # Read-only datasets keep working; the histogram is just rebuilt next time.
+        pass
+    return hist
+
+
+def _tile_stats_contrast(preview, stats_path, key):
+    # Contrast limits read off the CDF of the preview level's full histogram, so they are the
+    # exact global quantiles. The histogram comes from the sidecar or is built from the preview
+    # level's zarr.Array. None for non-uint8/uint16 data or when no zarr.Array is available.
+    if np.dtype(preview.dtype) not in (np.uint8, np.uint16):
+        return None
+    hist = _load_tile_stats(stats_path, key)
+    if hist is None:
+        zarray = _backing_zarr_array(preview)
+        if zarray is None:
+            return None
+        hist = _build_tile_stats(zarray, stats_path, key)
+    limits = _cdf_quantiles(hist, np.arange(hist.size), CONTRAST_QUANTILES)
+    if limits is None:
+        return None
+    lo, hi = limits
     if hi <= lo:
         hi = lo + 1.0
     return lo, hi
@@ -206,13 +533,13 @@ def _configure_3d_view(viewer, layer, rendering):
     viewer.dims.ndisplay = 3
 
     # Prefer volume depiction and attenuated MIP; gracefully fall back if unavailable.
-    if hasattr(layer, "depiction"):
+    if "depiction" in _layer_caps(layer):
         try:
             layer.depiction = "volume"
         except Exception:
             pass
 
-    if hasattr(layer, "rendering"):
+    if "rendering" in _layer_caps(layer):
         candidates = [rendering] + [m for m in RENDER_MODES if m != rendering]
         for mode in candidates:
             try:
@@ -221,13 +548,13 @@ def _configure_3d_view(viewer, layer, rendering):
             except Exception:
                 continue
 
-    if hasattr(layer, "interpolation3d"):
+    if "interpolation3d" in _layer_caps(layer):
         try:
             layer.interpolation3d = "linear"
         except Exception:
             pass
 
-    if hasattr(layer, "attenuation"):
+    if "attenuation" in _layer_caps(layer):
         try:
             layer.attenuation = 0.05
         except Exception:
@@ -275,6 +602,18 @@ def main():
         default="attenuated_mip",
         help="3D volume rendering mode.",
     )
+    parser.add_argument(
+        "--no-preview-contrast",
+        action="store_true",
+        help="Skip percentile estimation for uint8/uint16 data: use 0-255, or 0 to the bit depth of "
+        "the coarsest level's maximum. Other dtypes use the regular estimate.",
+    )
+    parser.add_argument(
+        "--tile-stats",
+        action="store_true",
+        help="uint8/uint16 data: derive contrast from the preview level's histogram, built chunk by "
+        "chunk and kept in a .contrast_stats.zarr sidecar inside the dataset and reused on later launches.",
+    )
     args = parser.parse_args()
 
     path = os.path.abspath(args.path)
@@ -282,7 +621,8 @@ def main():
         raise FileNotFoundError(f"OME-Zarr folder not found: {path}")
 
     viewer = napari.Viewer(title=f"Napari OME-Zarr: {os.path.basename(path)}")
-    layers = viewer.open(path, plugin="napari-ome-zarr")
+    with _dask_threads():
+        layers = viewer.open(path, plugin="napari-ome-zarr")
     if not layers:
         raise RuntimeError(f"No layers loaded from: {path}")
 
@@ -290,8 +630,20 @@ def main():
     chosen_level = None
     xy_steps = None
     n_levels = _count_multiscale_levels(layer.data)
+    cache_path = _contrast_cache_path(path)
+    cache_key = _contrast_cache_key(path, layer.data, args)
+    cached = _load_contrast_cache(cache_path, cache_key)
+    # Take the contrast preview from the original pyramid before a display level replaces the
+    # layer; with --preserve-z the new layer is the full-Z base, which is far costlier to sample.
+    preview = _pick_preview_array(layer.data) if cached is None else None
+    dtype_source = None
+    if args.no_preview_contrast and cached is None:
+        # Coarsest level: the cheapest full max reduction.
+        dtype_source = layer.data[n_levels - 1] if n_levels > 0 else layer.data
     if args.view == "3d" and n_levels > 0:
         level_to_use = args.pyramid_level
+        if level_to_use is None and cached is not None and cached.get("level") is not None:
+            level_to_use = int(cached["level"])
         if level_to_use is None:
             level_to_use = _choose_safe_3d_level(layer.data)
         if args.preserve_z:
@@ -303,23 +655,29 @@ def main():
                 viewer, layer, level_to_use
             )
 
-    preview = _pick_preview_array(layer.data)
-    lo, hi = _estimate_contrast(preview)
-    layer.contrast_limits = (lo, hi)
     layer.gamma = 0.9
-
     if args.view == "3d":
         _configure_3d_view(viewer, layer, args.rendering)
-        if args.rendering == "iso" and hasattr(layer, "iso_threshold"):
-            try:
-                layer.iso_threshold = 0.5 * (lo + hi)
-            except Exception:
-                pass
 
     print(f"Loaded: {path}")
-    print(f"Contrast limits set to: [{lo:.3f}, {hi:.3f}]")
+    if cached is not None:
+        _apply_contrast(layer, float(cached["lo"]), float(cached["hi"]), args.view, args.rendering)
+    else:
+        # Estimate contrast off the Qt thread so the viewer paints right away; the limits are
+        # applied (and cached) when the worker returns.
+        def _on_contrast(limits):
+            lo, hi = limits
+            _apply_contrast(layer, lo, hi, args.view, args.rendering)
+            _save_contrast_cache(cache_path, cache_key, lo, hi, chosen_level)
+
+        tile_stats = (_tile_stats_path(path), _tile_stats_key(path, preview)) if args.tile_stats else None
+        mode = args.rendering if args.view == "3d" else None
+        worker = _compute_contrast(preview, mode, tile_stats, dtype_source)
+        worker.returned.connect(_on_contrast)
+        worker.start()
+
     print(f"View mode: {args.view.upper()}")
-    if args.view == "3d" and hasattr(layer, "rendering"):
+    if args.view == "3d" and "rendering" in _layer_caps(layer):
         try:
             print(f"Rendering: {layer.rendering}")
         except Exception: